@@ -1,20 +1,75 @@
 import os
+
+# Cooperative I/O for gunicorn's gevent worker; must run before anything
+# else imports socket/threading (or psycopg2).
+if os.getenv("USE_GEVENT"):
+    from gevent import monkey
+    monkey.patch_all()
+    from psycogreen.gevent import patch_psycopg
+    patch_psycopg()
+
+import functools
+import hashlib
+import operator
+import queue
 import random
-from collections import defaultdict
+import tempfile
+import threading
+import time
 from datetime import datetime
 from uuid import uuid4
 
 from flask import (
     Flask, render_template, request, redirect, session,
-    url_for, abort, jsonify, flash
+    url_for, abort, jsonify, flash, g
 )
+from flask.json.provider import DefaultJSONProvider
+from flask_caching import Cache
+from flask_compress import Compress
+from flask_minify import Minify
+from flask_session import Session
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy import text
+from sqlalchemy import Float, bindparam, case, cast, func, select, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import SQLAlchemyError
+from jinja2 import FileSystemBytecodeCache
+from werkzeug.routing import BaseConverter
+import numpy as np
+import orjson
+import redis
 
 # ---------------- App & DB config ----------------
 app = Flask(__name__)
 app.config["SECRET_KEY"] = os.getenv("SECRET_KEY", "dev-secret-change-me")
 
+
+class OrjsonProvider(DefaultJSONProvider):
+    """app.json backed by orjson. Flask's signed-cookie session serializer
+    goes through app.json too, so cookie sessions use it as well."""
+
+    def _option(self, indent=False):
+        option = orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default, option=self._option()).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        option = self._option(indent) | orjson.OPT_APPEND_NEWLINE
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default, option=option), mimetype=self.mimetype
+        )
+
+
+app.json = OrjsonProvider(app)
+
 database_url = os.getenv("DATABASE_URL", "sqlite:///app.db")
 # Heroku sometimes provides postgres:// which SQLAlchemy deprecates
 if database_url.startswith("postgres://"):
@@ -22,9 +77,129 @@ if database_url.startswith("postgres://"):
 
 app.config["SQLALCHEMY_DATABASE_URI"] = database_url
 app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {"pool_pre_ping": True}
+if database_url.startswith("postgresql"):
+    # psycopg2 fast-execution helpers for executemany (batched UPDATEs,
+    # multi-row INSERTs); SQLAlchemy 2.0 names the VALUES page size
+    # insertmanyvalues_page_size
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"].update(
+        executemany_mode="values_plus_batch",
+        insertmanyvalues_page_size=1000,
+        executemany_batch_page_size=200,
+    )
 
 db = SQLAlchemy(app)
 
+# Server-side sessions: the cookie only carries a session id, the per-round
+# state lives in Redis. Without REDIS_URL (local dev) fall back to Flask's
+# default signed-cookie session.
+redis_url = os.getenv("REDIS_URL")
+if redis_url:
+    app.config.update(
+        SESSION_TYPE="redis",
+        SESSION_REDIS=redis.Redis.from_url(redis_url),
+        SESSION_PERMANENT=False,
+        # Flask-Session otherwise rewrites the session in Redis on every
+        # request; with this off only requests that modify it do a SET.
+        SESSION_REFRESH_EACH_REQUEST=False,
+    )
+    Session(app)
+
+# Response cache; shared through Redis when available so invalidation
+# reaches every worker, otherwise per-process.
+if redis_url:
+    cache = Cache(app, config={"CACHE_TYPE": "RedisCache", "CACHE_REDIS_URL": redis_url})
+else:
+    cache = Cache(app, config={"CACHE_TYPE": "SimpleCache"})
+
+# Compiled templates are shared on disk so fresh gunicorn workers skip
+# parsing. Templates only change on deploy, so no reload checks outside
+# the local debug server.
+jinja_cache_dir = os.getenv("JINJA_CACHE_DIR", os.path.join(tempfile.gettempdir(), "jinja_cache"))
+os.makedirs(jinja_cache_dir, exist_ok=True)
+app.jinja_env.bytecode_cache = FileSystemBytecodeCache(directory=jinja_cache_dir)
+if not app.debug and __name__ != "__main__":
+    app.config["TEMPLATES_AUTO_RELOAD"] = False
+    app.jinja_env.auto_reload = False
+
+
+# Compression: gzip/brotli for HTML, JSON and static text. Compressed bodies
+# are cached only for the endpoints in COMPRESS_CACHED_ENDPOINTS, keyed by a
+# digest of the body, since Flask-Compress keys its cache on the request
+# alone and most pages differ per participant.
+COMPRESS_CACHED_ENDPOINTS = {"admin_stats_json"}
+
+
+def compress_cache_key(req):
+    key = g.get("compress_cache_key")
+    return f"compress:{key}:{req.headers.get('Accept-Encoding', '')}" if key else None
+
+
+class OptInCompressCache:
+    def get(self, key):
+        return cache.get(key) if key else None
+
+    def set(self, key, value):
+        if key:
+            cache.set(key, value, timeout=60)
+
+
+app.config.update(
+    COMPRESS_MIMETYPES=["text/html", "application/json", "text/css", "application/javascript"],
+    COMPRESS_ALGORITHM=["br", "gzip"],
+    COMPRESS_CACHE_KEY=compress_cache_key,
+    COMPRESS_CACHE_BACKEND=OptInCompressCache,
+)
+Compress(app)
+# Registered after Compress so pages are minified before they are compressed
+Minify(app=app, html=True, js=True, cssless=True, static=False)
+
+
+# Registered last so it runs before Compress (after_request runs in reverse),
+# including for responses served from the view cache
+@app.after_request
+def tag_compress_cache_key(response):
+    if request.endpoint in COMPRESS_CACHED_ENDPOINTS and not response.is_streamed:
+        g.compress_cache_key = hashlib.sha1(response.get_data()).hexdigest()
+    return response
+
+
+# Static assets: behind a front web server /static is served straight from
+# disk (deploy/nginx.conf); otherwise (e.g. the Procfile deployment) Flask
+# serves it. Static URLs carry a content hash, so a URL whose ?v= matches
+# the file is cached for a year either way; anything else gets
+# SEND_FILE_MAX_AGE_DEFAULT.
+app.config["SEND_FILE_MAX_AGE_DEFAULT"] = 3600
+STATIC_HASHED_MAX_AGE = 31536000
+
+
+@functools.lru_cache(maxsize=None)
+def static_file_hash(filename):
+    path = os.path.join(app.static_folder, filename)
+    if not os.path.isfile(path):
+        return None
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()[:12]
+
+
+@app.url_defaults
+def add_static_hash(endpoint, values):
+    if endpoint == "static" and "filename" in values:
+        digest = static_file_hash(values["filename"])
+        if digest:
+            values.setdefault("v", digest)
+
+
+@app.after_request
+def cache_hashed_static(response):
+    if request.endpoint == "static" and response.status_code == 200:
+        filename = (request.view_args or {}).get("filename")
+        if filename and request.args.get("v") == static_file_hash(filename):
+            response.cache_control.public = True
+            response.cache_control.max_age = STATIC_HASHED_MAX_AGE
+            response.cache_control.immutable = True
+    return response
+
 
 # ---------------- Models ----------------
 class ExperimentState(db.Model):
@@ -35,8 +210,42 @@ class ExperimentState(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
 
 
+# CSV export columns, built once at import
+CSV_BASE_FIELDS = (
+    "id", "created_at", "name", "gender", "age", "race",
+    "chosen_round", "average_x", "final_payoff",
+)
+# Per-round column names, indexed by round number (index 0 unused)
+ROUND_KEYS = [None] + [(f"x_{i}", f"win_{i}", f"wealth_{i}", f"time_ms_{i}") for i in range(1, 11)]
+CSV_FIELDNAMES = (
+    *CSV_BASE_FIELDS,
+    *[keys[0] for keys in ROUND_KEYS[1:]],
+    *[keys[1] for keys in ROUND_KEYS[1:]],
+    *[keys[2] for keys in ROUND_KEYS[1:]],
+    *[keys[3] for keys in ROUND_KEYS[1:]],
+)
+CSV_HEADER = ",".join(CSV_FIELDNAMES) + "\r\n"
+ROUND_COLUMNS = CSV_FIELDNAMES[len(CSV_BASE_FIELDS):]
+# All 40 per-round values in one C-level call
+_ROUND_VALUES = operator.attrgetter(*ROUND_COLUMNS)
+
+
+def _q(s):
+    """Quote a string CSV field only when it needs it (csv.QUOTE_MINIMAL)."""
+    if s is None:
+        return ""
+    if "," in s or '"' in s or "\n" in s or "\r" in s:
+        return '"' + s.replace('"', '""') + '"'
+    return s
+
+
+def _n(v):
+    return "" if v is None else str(v)
+
+
 class Participant(db.Model):
     __tablename__ = "participants"
+    __table_args__ = (db.Index("ix_participants_created_at", "created_at"),)
     id = db.Column(db.String, primary_key=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
 
@@ -48,35 +257,57 @@ class Participant(db.Model):
 
     # experiment
     chosen_round = db.Column(db.Integer)   # R in {1..10}
-    rounds = db.Column(db.JSON)            # list of dicts per round
     average_x = db.Column(db.Float)
     final_payoff = db.Column(db.Float)
-
-    def to_row(self):
-        """Flatten for CSV export."""
-        row = {
-            "id": self.id,
-            "created_at": self.created_at.isoformat(),
-            "name": self.name,
-            "gender": self.gender,
-            "age": self.age,
-            "race": self.race,
-            "chosen_round": self.chosen_round,
-            "average_x": self.average_x,
-            "final_payoff": self.final_payoff,
-        }
-        if isinstance(self.rounds, list):
-            for r in self.rounds:
-                i = r.get("round")
-                row[f"x_{i}"] = r.get("x")
-                # Support both new (win) and old (flip) schemas
-                win = r.get("win")
-                if win is None:
-                    win = (r.get("flip") == "heads")
-                row[f"win_{i}"] = bool(win)
-                row[f"wealth_{i}"] = r.get("wealth")
-                row[f"time_ms_{i}"] = r.get("time_ms")
-        return row
+    # per-round results x_i, win_i, wealth_i, time_ms_i (i = 1..10) are
+    # native columns, added below
+
+
+# One column per round and field; NULL for a round that was never played
+for _kx, _kwin, _kwealth, _kt in ROUND_KEYS[1:]:
+    setattr(Participant, _kx, db.Column(_kx, db.SmallInteger))
+    setattr(Participant, _kwin, db.Column(_kwin, db.Boolean))
+    setattr(Participant, _kwealth, db.Column(_kwealth, db.Float))
+    setattr(Participant, _kt, db.Column(_kt, db.BigInteger))
+
+
+def flatten_rounds(rounds):
+    """Map a list of round dicts onto the per-round columns."""
+    values = dict.fromkeys(ROUND_COLUMNS)
+    for r in rounds or []:
+        if not r:
+            continue
+        get = r.get
+        kx, kwin, kwealth, kt = ROUND_KEYS[r["round"]]
+        values[kx] = get("x")
+        # Support both new (win) and old (flip) schemas
+        win = get("win")
+        if win is None:
+            win = (get("flip") == "heads")
+        values[kwin] = bool(win)
+        values[kwealth] = get("wealth")
+        values[kt] = get("time_ms")
+    return values
+
+
+def export_line(p):
+    """
+    One CSV export line (columns as in CSV_FIELDNAMES) for a participant
+    row, ORM object or Core row. Quoting follows the csv module's
+    QUOTE_MINIMAL; None is written as an empty field.
+    """
+    return ",".join([
+        _q(p.id),
+        p.created_at.isoformat(),
+        _q(p.name),
+        _q(p.gender),
+        _n(p.age),
+        _q(p.race),
+        _n(p.chosen_round),
+        _n(p.average_x),
+        _n(p.final_payoff),
+        *map(_n, _ROUND_VALUES(p)),
+    ]) + "\r\n"
 
 
 # ---------------- One-time setup & light migrations ----------------
@@ -89,6 +320,32 @@ def ensure_state():
     return st
 
 
+# In-process cache of the singleton state row for the player routes.
+# admin_state refreshes it in the worker that handled the toggle; other
+# workers pick the change up once the TTL expires.
+STATE_CACHE_TTL = 5.0
+_STATE_CACHE = {"is_open": None, "title": None, "loaded_at": 0.0}
+_STATE_LOCK = threading.Lock()
+
+
+def cached_state():
+    with _STATE_LOCK:
+        stale = time.monotonic() - _STATE_CACHE["loaded_at"] > STATE_CACHE_TTL
+        if _STATE_CACHE["is_open"] is None or stale:
+            st = ensure_state()
+            _STATE_CACHE.update(is_open=st.is_open, title=st.title, loaded_at=time.monotonic())
+        return dict(_STATE_CACHE)
+
+
+def refresh_state_cache(st):
+    with _STATE_LOCK:
+        _STATE_CACHE.update(
+            is_open=st.is_open,
+            title=st.title,
+            loaded_at=time.monotonic(),
+        )
+
+
 def run_simple_migrations():
     """
     Add columns that might be missing from older deployments
@@ -104,21 +361,173 @@ def run_simple_migrations():
                 conn.execute(text("ALTER TABLE participants ADD COLUMN average_x DOUBLE PRECISION"))
             if "final_payoff" not in cols:
                 conn.execute(text("ALTER TABLE participants ADD COLUMN final_payoff DOUBLE PRECISION"))
-            if "rounds" not in cols:
-                # Prefer JSON/JSONB; fall back to TEXT if needed
-                try:
-                    conn.execute(text("ALTER TABLE participants ADD COLUMN rounds JSONB"))
-                except Exception:
-                    try:
-                        conn.execute(text("ALTER TABLE participants ADD COLUMN rounds JSON"))
-                    except Exception:
-                        conn.execute(text("ALTER TABLE participants ADD COLUMN rounds TEXT"))
+            for c in (c for c in ROUND_COLUMNS if c not in cols):
+                col_type = Participant.__table__.c[c].type.compile(dialect=db.engine.dialect)
+                conn.execute(text(f"ALTER TABLE participants ADD COLUMN {c} {col_type}"))
+            conn.execute(text(
+                "CREATE INDEX IF NOT EXISTS ix_participants_created_at ON participants (created_at)"
+            ))
+    backfill_legacy_rounds()
+
+
+def backfill_legacy_rounds():
+    """
+    Older deployments kept the rounds as a JSON list; copy them into the
+    per-round columns for rows that only have the JSON. The old column is
+    left in place, unused. A no-op once every row is converted.
+    """
+    insp = db.inspect(db.engine)
+    if "participants" not in insp.get_table_names():
+        return
+    cols = {c["name"] for c in insp.get_columns("participants")}
+    if "rounds" not in cols or "x_1" not in cols:
+        return
+    with db.engine.begin() as conn:
+        rows = conn.execute(text(
+            "SELECT id, rounds FROM participants WHERE rounds IS NOT NULL AND x_1 IS NULL"
+        )).all()
+        updates = []
+        for pid, rounds in rows:
+            if isinstance(rounds, str):
+                rounds = orjson.loads(rounds)
+            updates.append({"pid": pid, **flatten_rounds(rounds)})
+        if updates:
+            table = Participant.__table__
+            conn.execute(table.update().where(table.c.id == bindparam("pid")), updates)
+
+
+def setup_database():
+    """Create tables, apply the light migrations and seed the state row."""
+    with app.app_context():
+        db.create_all()
+        run_simple_migrations()
+        ensure_state()
+
+
+# Schema setup runs once per deploy (the Procfile release phase sets
+# RUN_MIGRATIONS), not in every forked gunicorn worker. The local debug
+# server always runs it.
+if os.getenv("RUN_MIGRATIONS") or __name__ == "__main__":
+    setup_database()
+else:
+    # Old dynos keep serving, and writing JSON-only rows, for a while after
+    # the release phase; every web worker start converts whatever they left.
+    # Rows written after the last worker started wait for the next start
+    # (deploy or dyno restart).
+    try:
+        with app.app_context():
+            backfill_legacy_rounds()
+    except SQLAlchemyError:
+        app.logger.exception("legacy rounds backfill failed")
+
+
+# ---------------- Persistence ----------------
+UPSERT_COLUMNS = (
+    "name", "gender", "age", "race",
+    "chosen_round", "average_x", "final_payoff",
+    *ROUND_COLUMNS,
+)
+
+
+def upsert_participants(rows):
+    """
+    Insert or update participants by id in a single statement
+    (INSERT ... ON CONFLICT (id) DO UPDATE). Ids must be unique within
+    rows. Does not commit.
+    """
+    dialect = db.engine.dialect.name
+    if dialect == "postgresql":
+        insert = postgresql.insert
+    elif dialect == "sqlite":
+        insert = sqlite.insert
+    else:
+        for values in rows:
+            db.session.merge(Participant(**values))
+        return
+    stmt = insert(Participant).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["id"],
+        set_={k: stmt.excluded[k] for k in UPSERT_COLUMNS},
+    )
+    db.session.execute(stmt)
 
 
-with app.app_context():
-    db.create_all()
-    run_simple_migrations()
-    ensure_state()
+# Finished participants are written by one writer thread per process:
+# results() queues its row and waits, and the writer upserts everything
+# queued since its last commit in one statement and one commit. A lone
+# finisher is written straight away; under a burst the rows that arrive
+# during a commit go out together in the next one.
+RESULTS_BATCH_MAX = 32
+RESULTS_WRITE_TIMEOUT = 5.0
+
+_results_queue = queue.Queue()
+_results_writer = None
+_results_writer_lock = threading.Lock()
+
+
+class PendingWrite:
+    def __init__(self, values):
+        self.values = values
+        self.done = threading.Event()
+        self.error = None
+
+
+def _write_results_batch():
+    batch = [_results_queue.get()]
+    while len(batch) < RESULTS_BATCH_MAX:
+        try:
+            batch.append(_results_queue.get_nowait())
+        except queue.Empty:
+            break
+    # One row per participant; a reload of /results queues the same id again
+    rows = {w.values["id"]: w.values for w in batch}
+    errors = {}
+    try:
+        with app.app_context():
+            try:
+                upsert_participants(list(rows.values()))
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                if len(rows) == 1:
+                    errors.update(dict.fromkeys(rows, e))
+                else:
+                    # Write the batch row by row, so a bad row only fails
+                    # its own participant's request
+                    for pid, values in rows.items():
+                        try:
+                            upsert_participants([values])
+                            db.session.commit()
+                        except Exception as e:
+                            db.session.rollback()
+                            errors[pid] = e
+            if len(errors) < len(rows):
+                invalidate_stats()
+    finally:
+        for w in batch:
+            w.error = errors.get(w.values["id"])
+            w.done.set()
+
+
+def _results_writer_loop():
+    while True:
+        _write_results_batch()
+
+
+def save_results(values):
+    """Hand a finished participant to the writer and wait for the commit."""
+    global _results_writer
+    with _results_writer_lock:
+        # Started lazily so each gunicorn worker gets its own after fork
+        if _results_writer is None or not _results_writer.is_alive():
+            _results_writer = threading.Thread(target=_results_writer_loop, daemon=True)
+            _results_writer.start()
+    write = PendingWrite(values)
+    _results_queue.put(write)
+    if not write.done.wait(RESULTS_WRITE_TIMEOUT):
+        raise RuntimeError("timed out waiting for the results write")
+    if write.error is not None:
+        raise write.error
 
 
 # ---------------- Session helpers ----------------
@@ -126,26 +535,66 @@ def require_pid():
     return session.get("pid")
 
 
-def current_state():
-    return session.setdefault(
-        "state",
-        {
-            "rounds": [],      # list of dicts: {round, x, win, wealth, time_ms}
-            "R": None,         # secret chosen round 1..10
-            "demographics": {},  # name, gender, age, race
-        },
-    )
+# Participant state lives in separate top-level session keys, so each
+# handler only touches what it changes:
+#   rounds        slot n-1: {round, x, win, wealth, time_ms} or None
+#   R             secret chosen round 1..10
+#   coins         pre-drawn 50/50 outcomes, one bit per round
+#   demographics  name, gender, age, race
+def current_rounds():
+    if "state" in session:
+        # Sessions from before the split kept everything under "state"
+        for k, v in session.pop("state").items():
+            session.setdefault(k, v)
+    rounds = session.get("rounds")
+    if rounds is None:
+        rounds = session["rounds"] = [None] * 10
+    elif len(rounds) != 10:
+        # Sessions from before the fixed-slot layout kept a sorted list
+        slots = [None] * 10
+        for r in rounds:
+            slots[r["round"] - 1] = r
+        rounds = session["rounds"] = slots
+    return rounds
 
 
 def experiment_open_required():
-    return ensure_state().is_open
+    return cached_state()["is_open"]
+
+
+# Player pages whose HTML depends only on their arguments are rendered once
+# per distinct argument set. Pages shown with a pending flash message, and
+# everything on the reloading debug server, bypass the cache.
+@functools.lru_cache(maxsize=1024)
+def _render_cached(template, context):
+    return render_template(template, **dict(context))
+
+
+def render_page(template, **context):
+    if app.jinja_env.auto_reload or "_flashes" in session:
+        return render_template(template, **context)
+    return _render_cached(template, tuple(sorted(context.items())))
+
+
+class RoundConverter(BaseConverter):
+    """Round numbers 1..10; anything else fails routing with a 404."""
+    regex = r"10|[1-9]"
+
+    def to_python(self, value):
+        return int(value)
+
+    def to_url(self, value):
+        return str(value)
+
+
+app.url_map.converters["round"] = RoundConverter
 
 
 # ---------------- Player routes ----------------
 @app.route("/")
 def index():
-    st = ensure_state()
-    return render_template("index.html", open=st.is_open, title=st.title)
+    st = cached_state()
+    return render_page("index.html", open=st["is_open"], title=st["title"])
 
 
 @app.route("/start", methods=["POST"])
@@ -155,9 +604,11 @@ def start():
         return redirect(url_for("index"))
     session.clear()
     session["pid"] = str(uuid4())
-    st = current_state()
-    st["R"] = random.randint(1, 10)  # secret round
-    session["state"] = st
+    session["rounds"] = [None] * 10
+    # Draw the secret round and all 10 outcomes up front, so the sequence is
+    # fixed at enrolment rather than per submission
+    session["R"] = random.randint(1, 10)  # secret round
+    session["coins"] = random.getrandbits(10)  # bit n-1 set = round n wins
     return redirect(url_for("survey"))
 
 
@@ -170,34 +621,29 @@ def survey():
         gender = request.form.get("gender") or ""
         age = request.form.get("age") or ""
         race = request.form.get("race") or ""
-        st = current_state()
-        st["demographics"] = {
+        session["demographics"] = {
             "name": name,
             "gender": gender,
             "age": int(age) if age else None,
             "race": race,
         }
-        session["state"] = st
         return redirect(url_for("instructions"))
-    return render_template("survey.html")
+    return render_page("survey.html")
 
 
 @app.route("/instructions")
 def instructions():
     if not require_pid():
         return redirect(url_for("index"))
-    return render_template("instructions.html")
+    return render_page("instructions.html")
 
 
-@app.route("/round/<int:n>", methods=["GET", "POST"])
+@app.route("/round/<round:n>", methods=["GET", "POST"])
 def round_page(n: int):
     if not require_pid():
         return redirect(url_for("index"))
-    if n < 1 or n > 10:
-        abort(404)
 
-    st = current_state()
-    rounds = st["rounds"]
+    rounds = current_rounds()
 
     if request.method == "POST":
         # Get decision
@@ -208,39 +654,29 @@ def round_page(n: int):
         x = max(0, min(100, x))
         time_ms = int(request.form.get("time_ms") or "0")
 
-        # 50/50 outcome: win or not win
-        win = random.choice([True, False])
+        # 50/50 outcome drawn at start; sessions from before that fall back
+        coins = session.get("coins")
+        win = bool(coins >> (n - 1) & 1) if coins is not None else random.choice([True, False])
         wealth = 100 - x + (2.5 * x if win else 0.0)
 
         # Save/overwrite round n
-        found = False
-        for r in rounds:
-            if r["round"] == n:
-                r.update({"x": x, "win": win, "wealth": wealth, "time_ms": time_ms})
-                found = True
-                break
-        if not found:
-            rounds.append({"round": n, "x": x, "win": win, "wealth": wealth, "time_ms": time_ms})
-
-        rounds.sort(key=lambda r: r["round"])
-        st["rounds"] = rounds
-        session["state"] = st
+        rounds[n - 1] = {"round": n, "x": x, "win": win, "wealth": wealth, "time_ms": time_ms}
+        session["rounds"] = rounds
 
         # Show per-round outcome
         return redirect(url_for("round_outcome", n=n))
 
     # GET -> prefill if player came back
-    prev = next((r for r in rounds if r["round"] == n), None)
+    prev = rounds[n - 1]
     prefill = prev["x"] if prev else 0
-    return render_template("round.html", n=n, prefill=prefill)
+    return render_page("round.html", n=n, prefill=prefill)
 
 
-@app.route("/round/<int:n>/outcome")
+@app.route("/round/<round:n>/outcome")
 def round_outcome(n: int):
     if not require_pid():
         return redirect(url_for("index"))
-    st = current_state()
-    r = next((r for r in st["rounds"] if r["round"] == n), None)
+    r = current_rounds()[n - 1]
     if not r:
         return redirect(url_for("round_page", n=n))
     next_url = url_for("round_page", n=n + 1) if n < 10 else url_for("results")
@@ -252,36 +688,31 @@ def results():
     if not require_pid():
         return redirect(url_for("index"))
 
-    st = current_state()
-    rounds = st.get("rounds", [])
-    if len(rounds) < 10:
+    rounds = current_rounds()
+    if None in rounds:
         # prevent skipping ahead
-        return redirect(url_for("round_page", n=len(rounds) + 1))
+        return redirect(url_for("round_page", n=rounds.index(None) + 1))
 
     xs = [r.get("x", 0) for r in rounds]
     average_x = (sum(xs) / len(xs)) if xs else 0.0
-    R = st.get("R") or 1
-    wealth_R = next((r["wealth"] for r in rounds if r["round"] == R), 0.0)
+    R = session.get("R") or 1
+    wealth_R = rounds[R - 1]["wealth"]
     final_payoff = wealth_R
 
-    # Persist to DB (idempotent upsert by session id)
-    pid = require_pid()
-    p = Participant.query.get(pid)
-    if not p:
-        p = Participant(id=pid)
-
-    d = st.get("demographics", {})
-    p.name = d.get("name")
-    p.gender = d.get("gender")
-    p.age = d.get("age")
-    p.race = d.get("race")
-    p.chosen_round = R
-    p.rounds = rounds
-    p.average_x = average_x
-    p.final_payoff = final_payoff
-
-    db.session.add(p)
-    db.session.commit()
+    # Persist to DB (idempotent upsert by session id, batched with other
+    # participants finishing at the same time)
+    d = session.get("demographics", {})
+    save_results({
+        "id": require_pid(),
+        "name": d.get("name"),
+        "gender": d.get("gender"),
+        "age": d.get("age"),
+        "race": d.get("race"),
+        "chosen_round": R,
+        "average_x": average_x,
+        "final_payoff": final_payoff,
+        **flatten_rounds(rounds),
+    })
 
     return render_template(
         "results.html",
@@ -300,13 +731,24 @@ def require_admin():
         abort(403)
 
 
+def _played(col):
+    return case((col.isnot(None), 1), else_=0)
+
+
+def count_decisions():
+    """Total number of stored rounds, counted in a single SQL aggregate."""
+    x_cols = [Participant.__table__.c[kx] for kx, _, _, _ in ROUND_KEYS[1:]]
+    played = sum(_played(c) for c in x_cols)
+    return int(db.session.execute(select(func.coalesce(func.sum(played), 0))).scalar())
+
+
 @app.route("/admin")
 def admin_home():
     require_admin()
     st = ensure_state()
     counts = {
         "participants": Participant.query.count(),
-        "decisions": sum(len(p.rounds or []) for p in Participant.query.all()),
+        "decisions": count_decisions(),
     }
     return render_template("admin.html", state=st, counts=counts, key=request.args.get("key"))
 
@@ -322,102 +764,107 @@ def admin_state():
         st.is_open = False
     db.session.add(st)
     db.session.commit()
+    refresh_state_cache(st)
     return redirect(url_for("admin_home", key=request.form.get("key")))
 
 
 @app.route("/admin/reset", methods=["POST"])
 def admin_reset():
     require_admin()
-    Participant.query.delete()
-    db.session.commit()
+    dialect = db.engine.dialect.name
+    if dialect == "postgresql":
+        # TRUNCATE leaves no dead tuples/index bloat behind, unlike DELETE
+        db.session.execute(text("TRUNCATE participants RESTART IDENTITY"))
+        db.session.commit()
+    else:
+        Participant.query.delete()
+        db.session.commit()
+        if dialect == "sqlite":
+            # Reclaim the freed pages; VACUUM cannot run inside a transaction
+            with db.engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+                conn.execute(text("VACUUM"))
+    invalidate_stats()
     return redirect(url_for("admin_home", key=request.form.get("key")))
 
 
+EXPORT_BATCH = 500  # rows fetched and streamed per chunk
+
+
 @app.route("/admin/export")
 def admin_export():
     require_admin()
-    import csv, io
-
-    buf = io.StringIO()
-    writer = csv.DictWriter(
-        buf,
-        fieldnames=[
-            "id",
-            "created_at",
-            "name",
-            "gender",
-            "age",
-            "race",
-            "chosen_round",
-            "average_x",
-            "final_payoff",
-            *[f"x_{i}" for i in range(1, 11)],
-            *[f"win_{i}" for i in range(1, 11)],
-            *[f"wealth_{i}" for i in range(1, 11)],
-            *[f"time_ms_{i}" for i in range(1, 11)],
-        ],
-    )
-    writer.writeheader()
-    for p in Participant.query.order_by(Participant.created_at.asc()).all():
-        writer.writerow(p.to_row())
 
-    buf.seek(0)
-    from flask import Response
+    def generate():
+        # Lines are formatted directly (see export_line) and
+        # handed off in batches of EXPORT_BATCH rows, so memory stays
+        # bounded no matter how many participants are exported.
+        batch = [CSV_HEADER]
+        # Plain Core rows, no ORM identity map or lazy loads, fetched
+        # EXPORT_BATCH at a time; on Postgres stream_results makes psycopg2
+        # use a named server-side cursor.
+        # Only the exported columns are selected; anything else left on the
+        # table (such as the legacy rounds JSON) is never read.
+        query = (
+            select(*(Participant.__table__.c[k] for k in CSV_FIELDNAMES))
+            .order_by(Participant.created_at.asc())
+            .execution_options(yield_per=EXPORT_BATCH, stream_results=True)
+        )
+        for p in db.session.execute(query):
+            batch.append(export_line(p))
+            if len(batch) >= EXPORT_BATCH:
+                yield "".join(batch)
+                batch.clear()
+        yield "".join(batch)
+
+    from flask import Response, stream_with_context
 
     return Response(
-        buf.getvalue(),
+        stream_with_context(generate()),
         mimetype="text/csv",
         headers={"Content-Disposition": "attachment; filename=participants.csv"},
     )
 
 
+# Histogram bin labels by bin size, indexed by bin (average X is within 0..100)
+HIST_LABELS = {
+    size: [f"{i * size}–{i * size + size - 1}" for i in range(100 // size + 1)]
+    for size in (5, 10, 20)
+}
+
+
+def stats_cache_key():
+    # The generation is bumped whenever participant data changes; the admin
+    # key is part of the query string, so a wrong key never hits the cache.
+    generation = cache.get("stats_generation") or 0
+    return f"admin_stats:{generation}:{request.query_string.decode()}"
+
+
+def invalidate_stats():
+    cache.set("stats_generation", (cache.get("stats_generation") or 0) + 1, timeout=0)
+
+
 @app.route("/admin/stats.json")
+@cache.cached(timeout=10, make_cache_key=stats_cache_key)
 def admin_stats_json():
     """Aggregated stats based on each participant's average X (one record per person)."""
     require_admin()
 
-    parts = Participant.query.all()
-
-    # Average X for each participant (fallback to compute from rounds)
-    def avg_for(p):
-        if p.average_x is not None:
-            return float(p.average_x)
-        xs = [r.get("x", 0) for r in (p.rounds or []) if isinstance(r, dict)]
-        return (sum(xs) / len(xs)) if xs else 0.0
-
-    # Build per-participant records
-    records = []
-    for p in parts:
-        X = avg_for(p)
-        records.append({
-            "id": p.id,
-            "name": (p.name or p.id[:6]),
-            "gender": p.gender or "Unspecified",
-            "age": p.age,
-            "race": p.race or "Unspecified",
-            "X": X,
-        })
-
-    from collections import defaultdict
-
-    # Histograms of average X
-    def hist_by_bin(bin_size):
-        bins = defaultdict(int)
-        for r in records:
-            b = int(r["X"] // bin_size) * bin_size
-            key = f"{b}–{b + bin_size - 1}"
-            bins[key] += 1
-        def low(k): return int(k.split("–")[0])
-        return [{"bin": k, "count": bins[k]} for k in sorted(bins, key=low)]
-
-    # Average of average X by group
-    def avg_group(get_key):
-        sums, counts = defaultdict(float), defaultdict(int)
-        for r in records:
-            g = get_key(r)
-            sums[g] += r["X"]; counts[g] += 1
-        groups = sorted(counts.keys())
-        return [{"group": g, "avg_x": (sums[g] / counts[g]) if counts[g] else 0.0} for g in groups]
+    # Average X for each participant, computed in SQL: the stored average_x,
+    # else the mean over the rounds that were played
+    x_cols = [Participant.__table__.c[kx] for kx, _, _, _ in ROUND_KEYS[1:]]
+    sum_x = sum(func.coalesce(c, 0) for c in x_cols)
+    n_x = sum(_played(c) for c in x_cols)
+    avg_x = func.coalesce(Participant.average_x, cast(sum_x, Float) / func.nullif(n_x, 0), 0.0)
+    parts = db.session.execute(
+        select(
+            Participant.id,
+            Participant.name,
+            Participant.gender,
+            Participant.age,
+            Participant.race,
+            avg_x.label("x"),
+        )
+    ).all()
 
     # Age buckets for grouping
     def age_bucket(a):
@@ -428,37 +875,77 @@ def admin_stats_json():
         if a < 40: return "30–39"
         return "40+"
 
-    avg_by_gender = avg_group(lambda r: r["gender"])
-    avg_by_age    = avg_group(lambda r: age_bucket(r["age"]))
-    avg_by_race   = avg_group(lambda r: r["race"])
+    # One pass over the rows pulls out the per-participant columns and fills
+    # the name bins; the histograms and group means are then computed with
+    # NumPy.
+    x_list, genders, ages, races = [], [], [], []
+    # Sets from the start, so duplicate names are never retained
+    name_bins = [set() for _ in range(11)]
+    for p in parts:
+        x = float(p.x)
+        x_list.append(x)
+        genders.append(p.gender or "Unspecified")
+        ages.append(age_bucket(p.age))
+        races.append(p.race or "Unspecified")
+        name_bins[int(x // 10)].add(p.name or p.id[:6])
+    xs = np.array(x_list, dtype=np.float64)
+
+    # Histograms of average X
+    def hist_out(bin_size):
+        labels = HIST_LABELS[bin_size]
+        counts = np.bincount((xs // bin_size).astype(np.intp), minlength=len(labels))
+        return [{"bin": b, "count": int(c)} for b, c in zip(labels, counts) if c]
+
+    # Average of average X by group; np.unique returns the groups sorted
+    def avg_out(labels):
+        groups, idx = np.unique(np.array(labels, dtype=object), return_inverse=True)
+        sums = np.bincount(idx, weights=xs, minlength=len(groups))
+        counts = np.bincount(idx, minlength=len(groups))
+        avgs = sums / np.maximum(counts, 1)
+        return [{"group": g, "avg_x": float(a)} for g, a in zip(groups, avgs)]
+
+    avg_by_gender = avg_out(genders)
+    avg_by_age    = avg_out(ages)
+    avg_by_race   = avg_out(races)
 
     # Names per 10-point interval (by average X)
-    name_bins = defaultdict(list)
-    for r in records:
-        b = int(r["X"] // 10) * 10
-        key = f"{b}–{b + 9}"
-        name_bins[key].append(r["name"])
-    def low(k): return int(k.split("–")[0])
-    names_by_bin = [{"bin": k, "names": sorted(set(v))} for k, v in sorted(name_bins.items(), key=lambda kv: low(kv[0]))]
-
-    return jsonify({
-        "hist_5":  hist_by_bin(5),
-        "hist_10": hist_by_bin(10),
-        "hist_20": hist_by_bin(20),
+    names_by_bin = [
+        {"bin": b, "names": sorted(v)}
+        for b, v in zip(HIST_LABELS[10], name_bins) if v
+    ]
+
+    resp = jsonify({
+        "hist_5":  hist_out(5),
+        "hist_10": hist_out(10),
+        "hist_20": hist_out(20),
         "avg_by_gender": avg_by_gender,
         "avg_by_age":    avg_by_age,
         "avg_by_race":   avg_by_race,
         "names_by_bin_10": names_by_bin,
-        "participant_count": len(records),
+        "participant_count": len(parts),
     })
+    resp.headers["Cache-Control"] = "private, max-age=10"
+    return resp
 
 # ---------------- Health ----------------
+# Load balancers poll this every second; the body is reformatted only when
+# the wall-clock second changes.
+_HEALTH_BODY = b'{"ok":true,"time":"%s"}\n'
+_HEALTH_CACHE = {"sec": None, "body": b""}
+
+
 @app.route("/health")
 def health():
-    return {"ok": True, "time": datetime.utcnow().isoformat()}
+    sec = int(time.time())
+    if sec != _HEALTH_CACHE["sec"]:
+        stamp = datetime.utcfromtimestamp(sec).isoformat().encode()
+        _HEALTH_CACHE.update(sec=sec, body=_HEALTH_BODY % stamp)
+    return app.response_class(_HEALTH_CACHE["body"], mimetype="application/json")
 
 
 # ---------------- Entrypoint ----------------
+# Local development only; production runs under gunicorn's gevent worker
+# (see Procfile).
 if __name__ == "__main__":
     app.run(debug=True, host="0.0.0.0", port=int(os.getenv("PORT", 5000)))
 
@@ -0,0 +1,81 @@
+import contextlib
+import os
+import tempfile
+
+# app.py reads its configuration at import time
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(), "test.db")
+os.environ["ADMIN_KEY"] = "test-key"
+os.environ["RUN_MIGRATIONS"] = "1"
+os.environ.pop("REDIS_URL", None)
+os.environ.pop("USE_GEVENT", None)
+
+import pytest
+from sqlalchemy import event
+
+import app as app_module
+
+@pytest.fixture
+def app():
+    app_module.app.config["TESTING"] = True
+    yield app_module.app
+    with app_module.app.app_context():
+        app_module.Participant.query.delete()
+        app_module.db.session.commit()
+    app_module.cache.clear()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def admin_key():
+    return os.environ["ADMIN_KEY"]
+
+
+@pytest.fixture
+def add_participants(app):
+    """Insert n finished participants with all 10 rounds played."""
+    def add(n, prefix="p"):
+        rounds = [
+            {"round": k, "x": 10 * k, "win": k % 2 == 0, "wealth": 100.0, "time_ms": 1000}
+            for k in range(1, 11)
+        ]
+        with app.app_context():
+            app_module.upsert_participants([
+                {
+                    "id": f"{prefix}{i:04d}",
+                    "name": f"Player {i}",
+                    "gender": "Woman" if i % 2 else "Man",
+                    "age": 18 + i % 30,
+                    "race": "Asian",
+                    "chosen_round": 1 + i % 10,
+                    "average_x": 55.0,
+                    "final_payoff": 100.0,
+                    **app_module.flatten_rounds(rounds),
+                }
+                for i in range(n)
+            ])
+            app_module.db.session.commit()
+    return add
+
+
+@pytest.fixture
+def count_queries(app):
+    """Context manager yielding a list that collects the SQL run inside it."""
+    @contextlib.contextmanager
+    def counter():
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        with app.app_context():
+            engine = app_module.db.engine
+        event.listen(engine, "before_cursor_execute", before_cursor_execute)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    return counter
@@ -0,0 +1,30 @@
+import pytest
+
+
+@pytest.mark.parametrize("n", [1, 25])
+def test_stats_json_runs_one_query(client, admin_key, add_participants, count_queries, n):
+    add_participants(n)
+    with count_queries() as statements:
+        resp = client.get(f"/admin/stats.json?key={admin_key}")
+    assert resp.status_code == 200
+    assert resp.json["participant_count"] == n
+    assert len(statements) == 1
+
+
+def test_stats_json_cached_runs_no_query(client, admin_key, add_participants, count_queries):
+    add_participants(3)
+    client.get(f"/admin/stats.json?key={admin_key}")
+    with count_queries() as statements:
+        resp = client.get(f"/admin/stats.json?key={admin_key}")
+    assert resp.json["participant_count"] == 3
+    assert statements == []
+
+
+@pytest.mark.parametrize("n", [1, 25])
+def test_admin_home_query_count_is_flat(client, admin_key, add_participants, count_queries, n):
+    add_participants(n)
+    with count_queries() as statements:
+        resp = client.get(f"/admin?key={admin_key}")
+    assert resp.status_code == 200
+    # state row, participant count, decision count
+    assert len(statements) == 3
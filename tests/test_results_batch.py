@@ -0,0 +1,72 @@
+import app as app_module
+
+
+def finished(pid, **overrides):
+    rounds = [
+        {"round": k, "x": k, "win": True, "wealth": 102.5, "time_ms": 10}
+        for k in range(1, 11)
+    ]
+    values = {
+        "id": pid,
+        "name": f"Player {pid}",
+        "gender": "Woman",
+        "age": 20,
+        "race": "Asian",
+        "chosen_round": 3,
+        "average_x": 5.5,
+        "final_payoff": 102.5,
+        **app_module.flatten_rounds(rounds),
+    }
+    values.update(overrides)
+    return values
+
+
+def write_batch(rows):
+    """Queue rows and run one writer batch in the calling thread."""
+    writes = [app_module.PendingWrite(values) for values in rows]
+    for w in writes:
+        app_module._results_queue.put(w)
+    app_module._write_results_batch()
+    assert all(w.done.is_set() for w in writes)
+    return writes
+
+
+def saved_ids(app):
+    with app.app_context():
+        return {p.id for p in app_module.Participant.query.all()}
+
+
+def test_batch_is_written_together(app):
+    writes = write_batch([finished(f"ok{i}") for i in range(5)])
+    assert [w.error for w in writes] == [None] * 5
+    assert saved_ids(app) == {f"ok{i}" for i in range(5)}
+
+
+def test_bad_row_only_fails_its_own_write(app):
+    rows = [finished(f"ok{i}") for i in range(19)]
+    # A value the driver cannot bind fails the multi-row statement
+    rows.insert(7, finished("bad", name={"not": "bindable"}))
+    writes = write_batch(rows)
+
+    failed = [w.values["id"] for w in writes if w.error is not None]
+    assert failed == ["bad"]
+    assert saved_ids(app) == {f"ok{i}" for i in range(19)}
+
+
+def test_single_failed_row_reports_its_error(app):
+    (write,) = write_batch([finished("bad", name={"not": "bindable"})])
+    assert write.error is not None
+    assert saved_ids(app) == set()
+
+
+def test_results_page_saves_participant(client, app):
+    client.post("/start")
+    for n in range(1, 11):
+        client.post(f"/round/{n}", data={"x": "40", "time_ms": "5"})
+    resp = client.get("/results")
+    assert resp.status_code == 200
+    with client.session_transaction() as s:
+        pid = s["pid"]
+    with app.app_context():
+        p = app_module.db.session.get(app_module.Participant, pid)
+        assert p.x_10 == 40 and p.average_x == 40.0